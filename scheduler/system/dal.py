@@ -29,6 +29,14 @@ class DAL:
             doc_query={'_id': experiment_id},
             coll_name='experiments')
 
+    def get_experiments(self, experiments_ids):
+        """Return the experiments in the same order as the given ids."""
+        experiments = self.db.get_documents(
+            doc_query={'_id': {'$in': list(experiments_ids)}},
+            coll_name='experiments')
+        experiments_by_id = {experiment['_id']: experiment for experiment in experiments}
+        return [experiments_by_id[_id] for _id in experiments_ids if _id in experiments_by_id]
+
     def get_experiment_state(self, experiment_id):
         """ """
         return str(self.get_experiment(experiment_id)['state'])
@@ -36,6 +44,9 @@ class DAL:
     def retrieve_experiment_from_queue(self):
         return self.db.pop_document({}, 'queue', 'queue')
 
+    def retrieve_experiments_from_queue(self, limit):
+        return self.db.pop_documents({}, 'queue', 'queue', limit)
+
     def retrieve_experiment_from_running_queue(self):
         return self.db.pop_document({}, 'running', 'running')
 
@@ -57,6 +68,12 @@ class DAL:
             doc_update={'launch_time': launch_time},
             coll_name='experiments')
 
+    def update_experiments_launch(self, experiments_ids, new_state, launch_time):
+        self.db.update_documents(
+            doc_query={'_id': {'$in': list(experiments_ids)}},
+            doc_update={'state': new_state, 'launch_time': launch_time},
+            coll_name='experiments')
+
     def send_experiment_to_queue(self, experiment_id):
         self.db.push_document(
             doc_query={}, key='queue', element=experiment_id,
@@ -120,10 +137,13 @@ class DAL:
         return self.db.get_document(doc_query={}, coll_name='running')
 
     def save_running_experiment(self, experiment):
-        self.db.push_document(
+        self.save_running_experiments([experiment])
+
+    def save_running_experiments(self, experiments):
+        self.db.push_documents(
             doc_query={}, key='running',
-            element={
+            elements=[{
                 'experiment_id': experiment['_id'],
                 'launch_time': experiment['launch_time'],
-                'name': experiment['name']},
+                'name': experiment['name']} for experiment in experiments],
             coll_name='running')
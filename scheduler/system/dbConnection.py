@@ -119,6 +119,10 @@ class DBConnector:
         # (e.g. projection={‘_id’: False})
         return result if result else False
 
+    def get_documents(self, doc_query, coll_name, projection=None):
+        """Return all the documents that match the query in a list."""
+        return list(self.db[coll_name].find(doc_query, projection))
+
     def get_all_documents(self, coll_name):
         """Get all the documents from a collection."""
         cursor = self.db[coll_name].find({})
@@ -151,6 +155,15 @@ class DBConnector:
             self.logger.debug(str(e))
         return updated.matched_count if updated else False
 
+    def update_documents(self, doc_query, doc_update, coll_name):
+        """Update all the documents matched with the query."""
+        try:
+            updated = self.db[coll_name].update_many(doc_query, {'$set': doc_update})
+        except Exception as e:
+            self.logger.debug(str(e))
+            return False
+        return updated.matched_count
+
     def push_document(self, doc_query, key, element, coll_name, first=False):
         """Insert an element in a list in a document."""
         if first:
@@ -161,6 +174,11 @@ class DBConnector:
             self.db[coll_name].update_one(
                 doc_query, {'$push': {key: element}})
 
+    def push_documents(self, doc_query, key, elements, coll_name):
+        """Insert several elements at the end of a list in a document."""
+        self.db[coll_name].update_one(
+            doc_query, {'$push': {key: {'$each': list(elements)}}})
+
     def pop_document(self, doc_query, key, coll_name, last=False):
         """Return and remove the first element in a list in a documment."""
         result = self.db[coll_name].find_one_and_update(
@@ -173,6 +191,26 @@ class DBConnector:
         except IndexError:
             return False
 
+    def pop_documents(self, doc_query, key, coll_name, count):
+        """
+        Return and remove the first `count` elements in a list in a document.
+
+        The elements are only removed if they are still at the head of the
+        list, so two consumers never get the same elements.
+        """
+        while True:
+            document = self.db[coll_name].find_one(doc_query, {key: {'$slice': count}})
+            if not document or not document.get(key):
+                return []
+            elements = document[key]
+            head_query = dict(doc_query)
+            head_query['_id'] = document['_id']
+            head_query[key + '.0'] = elements[0]
+            pulled = self.db[coll_name].update_one(
+                head_query, {'$pull': {key: {'$in': elements}}})
+            if pulled.modified_count:
+                return elements
+
     def pull_document(self, doc_query, key, element, coll_name):
         """Remove the element specified in a list inside a document."""
         self.db[coll_name].update_one(doc_query, {'$pull': {key: element}})
@@ -194,6 +232,15 @@ class DBConnector:
         # then counts it. Very very cutre
         return len(self.get_document(coll_name=coll_name, doc_query=query)[key])
 
+    def watch(self, coll_name):
+        """
+        Iterate over the changes of a collection.
+        Change streams need MongoDB >= 3.6 running as a replica set.
+        """
+        with self.db[coll_name].watch() as stream:
+            for change in stream:
+                yield change
+
     def is_in_list(
             self, doc_query, key, element_key, element_value, coll_name):
         """Check if a element is in a list inside a document."""
@@ -17,19 +17,28 @@ limitations under the License.
 """Module which holds the abstraction and control for a experiment."""
 import queue
 import time
-import threading
 import logging
 import pdb
+from concurrent.futures import ThreadPoolExecutor
 
 from .kafka_producer import KafkaProducer
 from .dal import DAL
 
+# Messages to the automodeling monitor are sent by a few shared workers
+# instead of one thread per message.
+kafka_executor = ThreadPoolExecutor(max_workers=4)
+
 
 class Experiment:
     """Class which represents and control the lifecycle of a experiment."""
 
-    def __init__(self, experiment, kafka_server, db, orchestrator):
-        """Initialize the experiment."""
+    def __init__(self, experiment, kafka_server, db, orchestrator, on_stop=None):
+        """
+        Initialize the experiment.
+
+        on_stop is called with the experiment once it has been stopped and
+        its slot in the pool is free again.
+        """
         self.name = experiment["name"]
         self.id = experiment["_id"]
         self.create_time = experiment["create_time"]
@@ -51,6 +60,7 @@ class Experiment:
         self.kafka_producer = KafkaProducer(kafka_server, self.queue_experiment)
         self.dal = DAL(db)
         self.orch = orchestrator
+        self.on_stop = on_stop
         self.logger = logging.getLogger("SCHEDULER")
 
     def start(self):
@@ -87,9 +97,7 @@ class Experiment:
         """
         message = str(self.id)+'-metrics'
         if action == "start":
-            threading.Thread(
-                target=self.kafka_producer.send_topic,
-                args=['scheduler-monitor', message]).start()
+            kafka_executor.submit(self.kafka_producer.send_topic, 'scheduler-monitor', message)
 
         if action == "stop":
             payload = "<STOPPED>"
@@ -99,37 +107,46 @@ class Experiment:
                 payload = '<ACCURACY_REACHED>'
             if state == 'completed':
                 payload = '<EXPERIMENT_COMPLETED>'
-            threading.Thread(
-                target=self.kafka_producer.send_topic,
-                args=[message, payload]).start()
+            kafka_executor.submit(self.kafka_producer.send_topic, message, payload)
+
+    @property
+    def deadline(self):
+        """Time at which the experiment is stopped if it has not ended."""
+        return (self.start_time or time.time()) + self.time_out
 
     def control(self):
         """Manage the execution of a experiment."""
-        execution_deadline = self.start_time + self.time_out
-        while time.time() <= execution_deadline and self.state == "pool":
-            # Log experiment execution info.
-            self.state = self.dal.get_experiment_state(self.id)
-            self.logger.info(
-                'Control experiment ' + str(self.name)
-                + ' | State: ' + str(self.state)
-                + ' | Remaining time: ' + str(execution_deadline - time.time())
-                + ' | Accuracy: ' + str(self.accuracy))
-
-            # Check if experiment reached accuracy limit.
-            self.accuracy = self.dal.get_accuracy(self.id)
-            if self.accuracy >= self.accuracy_limit:
-                self.state = "accuracy_limit_reached"
-                # TODO update ddbb
-                self.logger.info("Accuracy limit: " + str(self.accuracy_limit) + " reached!!")
-
-            # Check kafka response
-            if self.get_kafka_response() == "error":
-                self.state = "failed"
-                # TODO update ddbb
-                self.logger.critical('EXPERIMENT FAILED  |  STATE: ' + self.state)
-
+        while time.time() <= self.deadline and self.check():
             time.sleep(2)
+        self.finish()
+
+    def check(self):
+        """Check the execution of the experiment. Return True while it is running."""
+        # Log experiment execution info.
+        self.state = self.dal.get_experiment_state(self.id)
+        self.logger.info(
+            'Control experiment ' + str(self.name)
+            + ' | State: ' + str(self.state)
+            + ' | Remaining time: ' + str(self.deadline - time.time())
+            + ' | Accuracy: ' + str(self.accuracy))
+
+        # Check if experiment reached accuracy limit.
+        self.accuracy = self.dal.get_accuracy(self.id)
+        if self.accuracy >= self.accuracy_limit:
+            self.state = "accuracy_limit_reached"
+            # TODO update ddbb
+            self.logger.info("Accuracy limit: " + str(self.accuracy_limit) + " reached!!")
+
+        # Check kafka response
+        if self.get_kafka_response() == "error":
+            self.state = "failed"
+            # TODO update ddbb
+            self.logger.critical('EXPERIMENT FAILED  |  STATE: ' + self.state)
 
+        return self.state == "pool"
+
+    def finish(self):
+        """Stop the experiment once it has ended or its time is out."""
         if self.state not in ("completed", "stopped", "accuracy_limit_reached", "failed"):
             self.state = "timeout"
 
@@ -176,3 +193,6 @@ class Experiment:
         self.logger.info('Updating experiment ' + self.name + ' state')
         self.dal.update_experiment_state(self.id, self.state)
         self.logger.info('Experiment ' + self.name + ' updated to state: ' + self.state)
+
+        if self.on_stop:
+            self.on_stop(self)
@@ -0,0 +1,151 @@
+"""
+Copyright 2018 Banco Bilbao Vizcaya Argentaria, S.A.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+# coding=utf-8
+"""Control of every running experiment from a single asyncio event loop."""
+import asyncio
+import math
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel holding the deadlines of the running experiments.
+
+    Deadlines are rounded up to `resolution` seconds and hashed into one of
+    `size` slots, so adding, removing and expiring a deadline costs O(1)
+    no matter how many experiments are running.
+    """
+
+    def __init__(self, resolution=1.0, size=512):
+        self.resolution = resolution
+        self.slots = [dict() for _ in range(size)]
+        self.ticks = dict()
+        self.current_tick = math.floor(time.time() / resolution)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def add(self, key, deadline):
+        """Schedule the key to expire at the deadline (a timestamp)."""
+        self.remove(key)
+        # Deadlines already due expire on the next advance.
+        tick = max(math.ceil(deadline / self.resolution), self.current_tick + 1)
+        self.slots[tick % len(self.slots)][key] = tick
+        self.ticks[key] = tick
+
+    def remove(self, key):
+        """Cancel the deadline of the key, if any."""
+        tick = self.ticks.pop(key, None)
+        if tick is not None:
+            del self.slots[tick % len(self.slots)][key]
+
+    def advance(self, now):
+        """Move the wheel up to `now` and return the keys whose deadline has passed."""
+        now_tick = math.floor(now / self.resolution)
+        expired = []
+        # A full turn visits every slot, no need to go round again.
+        first_tick = max(self.current_tick + 1, now_tick - len(self.slots) + 1)
+        for tick in range(first_tick, now_tick + 1):
+            slot = self.slots[tick % len(self.slots)]
+            for key in [key for key, key_tick in slot.items() if key_tick <= now_tick]:
+                del slot[key]
+                del self.ticks[key]
+                expired.append(key)
+        self.current_tick = max(self.current_tick, now_tick)
+        return expired
+
+
+class Supervisor(threading.Thread):
+    """
+    Supervise the experiments in the pool.
+
+    A single thread runs an event loop which, every poll_interval seconds,
+    checks the running experiments and expires their deadlines. Stopping an
+    experiment blocks on the orchestrator, so it is done in a bounded pool
+    of workers instead of the event loop.
+    """
+
+    def __init__(self, poll_interval=2, stop_workers=8):
+        threading.Thread.__init__(self, daemon=True)
+        self.logger = logging.getLogger("SCHEDULER")
+
+        self.poll_interval = poll_interval
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=stop_workers)
+        self.stopped = threading.Event()
+
+        self.experiments = dict()
+        self.deadlines = TimerWheel()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.supervise())
+        finally:
+            self.executor.shutdown(wait=False)
+            self.loop.close()
+
+    def watch(self, experiment):
+        """Take control of a started experiment. It can be called from any thread."""
+        self.loop.call_soon_threadsafe(self.add, experiment)
+
+    def shutdown(self):
+        """Stop supervising. The experiments in the pool are not stopped."""
+        self.stopped.set()
+
+    def add(self, experiment):
+        if experiment.state != "pool":
+            self.finish(experiment)
+            return
+        self.experiments[experiment.id] = experiment
+        self.deadlines.add(experiment.id, experiment.deadline)
+
+    async def supervise(self):
+        while not self.stopped.is_set():
+            for experiment_id in self.deadlines.advance(time.time()):
+                self.finish(self.experiments.pop(experiment_id))
+
+            if self.experiments:
+                experiments = list(self.experiments.values())
+                ended = await self.loop.run_in_executor(None, self.check_experiments, experiments)
+                for experiment in ended:
+                    if self.experiments.pop(experiment.id, None):
+                        self.deadlines.remove(experiment.id)
+                        self.finish(experiment)
+
+            await asyncio.sleep(self.poll_interval)
+
+    def check_experiments(self, experiments):
+        """Check the experiments and return the ones that are not running anymore."""
+        ended = []
+        for experiment in experiments:
+            try:
+                if not experiment.check():
+                    ended.append(experiment)
+            except Exception as e:
+                self.logger.error('Failed to check experiment ' + experiment.name + ': ' + str(e))
+        return ended
+
+    def finish(self, experiment):
+        def log_error(future):
+            if future.exception():
+                self.logger.error('Failed to stop experiment ' + experiment.name
+                                  + ': ' + str(future.exception()))
+
+        self.loop.run_in_executor(self.executor, experiment.finish).add_done_callback(log_error)
@@ -22,10 +22,11 @@ import logging
 
 from .experiment import Experiment
 from .dal import DAL
+from .supervisor import Supervisor
 
 
 class System(threading.Thread):
-    def __init__(self, orchestrator, db, kafka_server):
+    def __init__(self, orchestrator, db, kafka_server, poll_interval=5, launch_batch_size=50):
         threading.Thread.__init__(self)
 
         self.logger = logging.getLogger("SCHEDULER")
@@ -39,6 +40,21 @@ class System(threading.Thread):
         self.experiments_limit = 0
         self.experiments_running = 0
 
+        # The dispatch loop sleeps on this condition. It is notified when an
+        # experiment leaves the pool, and when the queue, running or system
+        # documents change (if the database supports change streams).
+        # poll_interval is only the fallback when nobody wakes it up.
+        self.poll_interval = poll_interval
+        # Maximum number of experiments popped from the queue at once.
+        self.launch_batch_size = launch_batch_size
+        self.wakeup = threading.Condition()
+        self.wakeup_pending = False
+        self.pool_lock = threading.Lock()
+        self.stopped = threading.Event()
+
+        # Controls every experiment in the pool from a single event loop.
+        self.supervisor = Supervisor()
+
 #        self.state_recovery()
 
     def state_recovery(self):
@@ -57,46 +73,103 @@ class System(threading.Thread):
             self.logger.warning('Trying to recover control')
 
             experiment_info = self.dal.get_experiment(experiment_in_pool['experiment_id'])
-            experiment = Experiment(experiment_info, self.kafka_server, self.db, self.orch)
+            experiment = Experiment(experiment_info, self.kafka_server, self.db, self.orch,
+                                    on_stop=self.release_slot)
             experiment.start()
 
             self.experiments_running += 1
-            threading.Thread(target=experiment.control).start()
+            self.supervisor.watch(experiment)
             self.logger.info(
                 'Control recovered for experiment ' + experiment.name)
 
     def run(self):
         """
         Check the system status, and launch the experiments if possible.
+
+        Every pass fills all the free slots of the pool. Then the loop waits
+        until an experiment is released, the queue or the system parameters
+        change, or poll_interval seconds have passed.
         """
         self.logger.info('READY TO LAUNCH EXPERIMENTS !!!!')
-        threading.Thread(target=self.monitor_running_experiments).start()
+        self.supervisor.start()
+        threading.Thread(target=self.monitor_running_experiments, daemon=True).start()
+        for coll_name in ('queue', 'running', 'system'):
+            threading.Thread(target=self.watch_collection, args=[coll_name], daemon=True).start()
 
-        while True:
+        while not self.stopped.is_set():
             system_status = self.check_system()
             self.logger.debug("System " + str(system_status[1])
                               + " - Experiments: " + str(self.experiments_running)
                               + " running, " + str(self.experiments_limit) + " max.")
             if not system_status[0]:
-                time.sleep(5)
+                self.wait(self.poll_interval)
                 continue
 
-            experiment_id = self.dal.retrieve_experiment_from_queue()
-            if experiment_id:
-                self.logger.info("Retrieved experiment " + str(experiment_id) + " from queue.")
-                self.launch_experiment(experiment_id)
-                self.logger.info('Experiment ' + str(experiment_id) + ' launched!!')
-            else:
+            if not self.dispatch():
                 self.logger.info('Queue empty.')
-            time.sleep(5)
+                self.wait(self.poll_interval)
+
+    def dispatch(self):
+        """Launch queued experiments until the pool is full or the queue is empty."""
+        launched = 0
+        while self.is_running and self.experiments_running < self.experiments_limit:
+            free_slots = self.experiments_limit - self.experiments_running
+            experiments_ids = self.dal.retrieve_experiments_from_queue(
+                min(free_slots, self.launch_batch_size))
+            if not experiments_ids:
+                break
+            self.logger.info("Retrieved " + str(len(experiments_ids)) + " experiments from queue.")
+            self.launch_experiments(experiments_ids)
+            self.logger.info(str(len(experiments_ids)) + ' experiments launched!!')
+            launched += len(experiments_ids)
+        return launched
+
+    def wait(self, timeout):
+        """Sleep until someone calls notify() or the timeout expires."""
+        with self.wakeup:
+            if not self.wakeup_pending:
+                self.wakeup.wait(timeout)
+            self.wakeup_pending = False
+
+    def notify(self):
+        """Wake up the dispatch loop."""
+        with self.wakeup:
+            self.wakeup_pending = True
+            self.wakeup.notify()
+
+    def shutdown(self):
+        """Stop the dispatch loop. Running experiments are not stopped."""
+        self.stopped.set()
+        self.supervisor.shutdown()
+        self.notify()
+
+    def release_slot(self, experiment):
+        """Free the pool slot of an experiment that has been stopped."""
+        with self.pool_lock:
+            self.experiments_running = max(self.experiments_running - 1, 0)
+        self.logger.debug('Experiment ' + experiment.name + ' released its slot in the pool.')
+        self.notify()
+
+    def watch_collection(self, coll_name):
+        """Wake up the dispatch loop on every change in the collection."""
+        try:
+            for _ in self.db.watch(coll_name):
+                self.notify()
+        except Exception as e:
+            self.logger.warning('Change streams not available for ' + coll_name + ': ' + str(e)
+                                + '. Polling every ' + str(self.poll_interval) + ' seconds.')
 
     def monitor_running_experiments(self):
         """Check periodically if there is space in the pool
         by querying current running experiments."""
-        while True:
+        while not self.stopped.is_set():
             time.sleep(10)
             running_list = self.dal.get_running_experiments()
-            self.experiments_running = len(running_list["running"])
+            with self.pool_lock:
+                released = self.experiments_running > len(running_list["running"])
+                self.experiments_running = len(running_list["running"])
+            if released:
+                self.notify()
 
     def check_system(self):
         """
@@ -121,20 +194,33 @@ class System(threading.Thread):
 
     def launch_experiment(self, experiment_id):
         """Launch the experiments stored in the execution queue."""
+        self.launch_experiments([experiment_id])
+
+    def launch_experiments(self, experiments_ids):
+        """
+        Launch a batch of experiments retrieved from the execution queue.
+
+        The state, launch time and running list of the whole batch are
+        saved with a constant number of database operations.
+        """
         self.logger.debug('Saving the launch time')
         launch_time = datetime.datetime.utcnow()
 
-        self.dal.update_experiment_state(experiment_id, 'pool')
-        self.dal.update_experiment_launch_time(experiment_id, launch_time)
+        self.dal.update_experiments_launch(experiments_ids, 'pool', launch_time)
 
-        experiment_info = self.dal.get_experiment(experiment_id)
+        experiments_info = self.dal.get_experiments(experiments_ids)
+        if not experiments_info:
+            return
 
-        self.logger.debug('Saving experiment in execution list')
-        self.dal.save_running_experiment(experiment_info)
+        self.logger.debug('Saving experiments in execution list')
+        with self.pool_lock:
+            self.dal.save_running_experiments(experiments_info)
+            self.experiments_running += len(experiments_info)
 
-        self.logger.info('Launching experiment ' + str(experiment_id))
-        experiment = Experiment(
-            experiment_info, self.kafka_server, self.db, self.orch)
-        experiment.start()
-        self.experiments_running += 1
-        threading.Thread(target=experiment.control).start()
+        for experiment_info in experiments_info:
+            self.logger.info('Launching experiment ' + str(experiment_info['_id']))
+            experiment = Experiment(
+                experiment_info, self.kafka_server, self.db, self.orch,
+                on_stop=self.release_slot)
+            experiment.start()
+            self.supervisor.watch(experiment)
@@ -0,0 +1,106 @@
+"""
+Copyright 2018 Banco Bilbao Vizcaya Argentaria, S.A.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""Fake components to benchmark the scheduler without external services."""
+import datetime
+import time
+
+from bson.objectid import ObjectId
+
+
+class RoundTripCounter:
+    """
+    Wrap a DBConnector counting the calls to its methods.
+
+    Each call sleeps `latency` seconds to simulate the network round trip
+    to a remote database.
+    """
+
+    def __init__(self, db, latency=0.0):
+        self._db = db
+        self.latency = latency
+        self.round_trips = 0
+
+    def __getattr__(self, name):
+        attribute = getattr(self._db, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            self.round_trips += 1
+            time.sleep(self.latency)
+            return attribute(*args, **kwargs)
+        return call
+
+
+class FakeOrchestrator:
+    """Orchestrator that takes `latency` seconds to start or remove a service."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.services = set()
+
+    def login(self):
+        pass
+
+    def start_service(self, service_name, parameters, model_template):
+        time.sleep(self.latency)
+        self.services.add(service_name)
+        return "success"
+
+    def remove_service(self, service_name):
+        time.sleep(self.latency)
+        self.services.discard(service_name)
+        return "success"
+
+
+class FakeKafkaProducer:
+    """Kafka producer which acknowledges every message immediately."""
+
+    def __init__(self, server, queue):
+        self.queue = queue
+        self.messages = []
+
+    def send_topic(self, topic, message):
+        self.messages.append((topic, message))
+        self.queue.put("success")
+
+
+def create_experiments(db, n_experiments, project_name='benchmark', time_out=3600):
+    """Save a project with n experiments in the database and queue all of them."""
+    project_id = db.save_document({
+        'name': project_name,
+        'experiments': [],
+        'optimization': {'type': 'grid', 'objective_function': 'accuracy', 'objective_result': 'max'}},
+        'projects')
+    db.save_document({'filename': 'benchmark.yml', 'services': {}}, 'models')
+
+    experiments_ids = []
+    for num in range(n_experiments):
+        experiment_id = db.save_document({
+            '_id': ObjectId(),
+            'name': project_name + 'model' + str(num),
+            'project_name': project_name,
+            'project_id': project_id,
+            'state': 'queue',
+            'create_time': datetime.datetime.utcnow(),
+            'template_name': 'benchmark.yml',
+            'time_out': time_out,
+            'accuracy_limit': 1,
+            'parameters': []}, 'experiments')
+        db.push_document({}, 'queue', experiment_id, 'queue')
+        db.push_document({'_id': project_id}, 'experiments', experiment_id, 'projects')
+        experiments_ids.append(experiment_id)
+    return experiments_ids
@@ -0,0 +1,103 @@
+"""
+Copyright 2018 Banco Bilbao Vizcaya Argentaria, S.A.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""Time needed to fill the pool with experiments waiting in the queue."""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from scheduler.system import experiment
+from scheduler.system.system import System
+
+from .fakes import FakeOrchestrator, FakeKafkaProducer, RoundTripCounter, create_experiments
+
+# Pre event-driven loop: one experiment launched every 5 seconds.
+LEGACY_SECONDS_PER_EXPERIMENT = 5
+
+
+@pytest.fixture
+def system(mongo_db, monkeypatch):
+    monkeypatch.setattr(experiment, 'KafkaProducer', FakeKafkaProducer)
+
+    system = System(orchestrator=FakeOrchestrator(), db=mongo_db,
+                    kafka_server='localhost:9092')
+    system.daemon = True
+    yield system
+    system.shutdown()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('n_experiments', [50, 200])
+def test_time_to_fill_pool(system, mongo_db, n_experiments):
+    create_experiments(mongo_db, n_experiments)
+    mongo_db.update_document({}, {'experiments_limit': n_experiments, 'running': True}, 'system')
+
+    start = time.perf_counter()
+    system.start()
+    while len(mongo_db.get_document({}, 'running')['running']) < n_experiments:
+        assert time.perf_counter() - start < 60, 'Pool not filled in 60 seconds'
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    print('\nTime to fill a pool of {n} experiments: {t:.3f}s (fixed 5s polling: {legacy}s)'.format(
+        n=n_experiments, t=elapsed, legacy=n_experiments * LEGACY_SECONDS_PER_EXPERIMENT))
+    assert elapsed < n_experiments * LEGACY_SECONDS_PER_EXPERIMENT
+
+
+@pytest.mark.benchmark
+def test_release_wakes_dispatcher(system, mongo_db):
+    create_experiments(mongo_db, 2)
+    mongo_db.update_document({}, {'experiments_limit': 1, 'running': True}, 'system')
+    system.poll_interval = 60
+
+    system.start()
+    while len(mongo_db.get_document({}, 'running')['running']) < 1:
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    launched = mongo_db.get_document({}, 'running')['running'][0]
+    mongo_db.pull_document({}, 'running', launched, 'running')
+
+    system.release_slot(SimpleNamespace(name=launched['name']))
+
+    while mongo_db.get_document({}, 'running')['running'] in ([], [launched]):
+        assert time.perf_counter() - start < 5, 'Dispatcher was not woken up'
+        time.sleep(0.01)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('batch_size', [1, 10, 50])
+def test_launch_overhead_per_experiment(mongo_db, monkeypatch, batch_size):
+    """Scheduling overhead only: starting the experiments themselves is skipped."""
+    monkeypatch.setattr(experiment.Experiment, 'start', lambda self: None)
+    n_experiments = 200
+    create_experiments(mongo_db, n_experiments)
+    mongo_db.update_document({}, {'experiments_limit': n_experiments, 'running': True}, 'system')
+
+    db = RoundTripCounter(mongo_db, latency=0.001)
+    system = System(orchestrator=FakeOrchestrator(), db=db, kafka_server='localhost:9092',
+                    launch_batch_size=batch_size)
+    system.check_system()
+    db.round_trips = 0
+
+    start = time.perf_counter()
+    system.dispatch()
+    elapsed = time.perf_counter() - start
+
+    assert len(mongo_db.get_document({}, 'running')['running']) == n_experiments
+    print('\nBatch size {k}: {rt} round trips, {ms:.2f}ms per experiment'.format(
+        k=batch_size, rt=db.round_trips, ms=elapsed * 1000 / n_experiments))
+    assert db.round_trips <= 6 * -(-n_experiments // batch_size)
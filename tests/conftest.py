@@ -0,0 +1,35 @@
+"""
+Copyright 2018 Banco Bilbao Vizcaya Argentaria, S.A.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import logging
+
+import pytest
+
+from scheduler.system.dbConnection import DBConnector
+
+
+@pytest.fixture
+def mongo_db():
+    """DBConnector working against an in-memory mongomock database."""
+    mongomock = pytest.importorskip('mongomock')
+
+    db = DBConnector.__new__(DBConnector)
+    db.logger = logging.getLogger("SCHEDULER")
+    db.db = mongomock.MongoClient()['beagleml']
+
+    db.save_document({'queue': []}, 'queue')
+    db.save_document({'running': []}, 'running')
+    db.save_document({'experiments_limit': 1, 'running': False}, 'system')
+    return db
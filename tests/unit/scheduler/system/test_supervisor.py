@@ -0,0 +1,108 @@
+"""
+Copyright 2018 Banco Bilbao Vizcaya Argentaria, S.A.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import threading
+import time
+
+from scheduler.system.supervisor import Supervisor, TimerWheel
+
+
+# TIMER WHEEL
+
+def test_timer_wheel_expires_due_keys():
+    wheel = TimerWheel(resolution=1, size=8)
+    now = wheel.current_tick
+    wheel.add('a', now + 2)
+    wheel.add('b', now + 5)
+
+    assert wheel.advance(now + 1) == []
+    assert wheel.advance(now + 2) == ['a']
+    assert wheel.advance(now + 4) == []
+    assert wheel.advance(now + 5) == ['b']
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_deadlines_beyond_one_turn():
+    wheel = TimerWheel(resolution=1, size=4)
+    now = wheel.current_tick
+    wheel.add('far', now + 10)
+
+    assert wheel.advance(now + 6) == []
+    assert wheel.advance(now + 10) == ['far']
+
+
+def test_timer_wheel_remove_and_past_deadlines():
+    wheel = TimerWheel(resolution=1, size=8)
+    now = wheel.current_tick
+    wheel.add('removed', now + 1)
+    wheel.add('past', now - 100)
+    wheel.remove('removed')
+
+    assert wheel.advance(now + 1) == ['past']
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_long_jump_visits_every_slot():
+    wheel = TimerWheel(resolution=1, size=4)
+    now = wheel.current_tick
+    keys = ['k' + str(i) for i in range(10)]
+    for i, key in enumerate(keys):
+        wheel.add(key, now + i + 1)
+
+    assert sorted(wheel.advance(now + 100)) == sorted(keys)
+
+
+# SUPERVISOR
+
+class FakeExperiment:
+    def __init__(self, name, checks=1, time_out=60):
+        self.id = name
+        self.name = name
+        self.state = "pool"
+        self.deadline = time.time() + time_out
+        self.checks = checks
+        self.finished = threading.Event()
+
+    def check(self):
+        self.checks -= 1
+        if self.checks <= 0:
+            self.state = "completed"
+        return self.state == "pool"
+
+    def finish(self):
+        if self.state == "pool":
+            self.state = "timeout"
+        self.finished.set()
+
+
+def test_supervisor_finishes_ended_and_timed_out_experiments():
+    supervisor = Supervisor(poll_interval=0.01)
+    ended = FakeExperiment('ended', checks=3)
+    timed_out = FakeExperiment('timed_out', checks=10 ** 6, time_out=-1)
+    failed_start = FakeExperiment('failed_start')
+    failed_start.state = "failed"
+
+    supervisor.start()
+    for experiment in (ended, timed_out, failed_start):
+        supervisor.watch(experiment)
+
+    for experiment in (ended, timed_out, failed_start):
+        assert experiment.finished.wait(5)
+    supervisor.shutdown()
+
+    assert ended.state == "completed"
+    assert timed_out.state == "timeout"
+    assert failed_start.state == "failed"
+    assert not supervisor.experiments